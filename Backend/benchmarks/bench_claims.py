@@ -0,0 +1,170 @@
+"""Race members for open tickets: read-check-write vs conditional claim vs claim-next.
+
+    python benchmarks/bench_claims.py --members 8 --tickets 400
+
+Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+Each member is its own process, so claims really are concurrent, and all
+start together on the same pile of open tickets:
+
+- readwrite: read the oldest open ticket, check its status, write it back,
+  as accept_ticket used to. Two members can both "win" the same ticket.
+- by-id: every member goes for the oldest open ticket through
+  claim_ticket(ticket_id=...), as members clicking Accept on the same
+  broadcast do. One wins, the others lose and try again.
+- next: claim_ticket() takes the next ticket in the queue. On Postgres the
+  candidates are locked SKIP LOCKED, so members do not collide at all.
+  SQLite serializes writers whatever the query, so only Postgres shows
+  how claims scale with members.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+MODES = ('readwrite', 'by-id', 'next')
+
+
+def seed(members, tickets):
+    from app import app, db, User, Ticket, rebuild_ticket_stats
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        customer = User(first_name='Bench', last_name='User', email='bench-user@example.com',
+                        phone='0000000000', password='x', role='user')
+        staff = [User(first_name='Bench', last_name=f'Member {i}', email=f'bench-member-{i}@example.com',
+                      phone=f'1{i:09d}', password='x', role='member') for i in range(members)]
+        db.session.add_all([customer] + staff)
+        db.session.flush()
+        db.session.add_all([
+            Ticket(user_id=customer.id, created_by=customer.id, category='Technical',
+                   priority=('High', 'Medium', 'Low')[i % 3], subject=f'Bench {i}', description='bench')
+            for i in range(tickets)
+        ])
+        rebuild_ticket_stats()
+        db.session.commit()
+        return [member.id for member in staff]
+
+
+def member(mode, member_id):
+    """Claim until no open ticket is left, after the parent says go on stdin."""
+    from sqlalchemy.exc import OperationalError
+    from app import app, db, Ticket, ChatMessage, IST, WELCOME_MESSAGE, claim_ticket
+    from datetime import datetime
+
+    won, lost, errors, latencies = [], 0, 0, []
+    with app.app_context():
+        print('ready', flush=True)
+        sys.stdin.readline()
+        while True:
+            began = time.perf_counter()
+            try:
+                if mode == 'next':
+                    row = claim_ticket(member_id)
+                    if row is None:
+                        break
+                    won.append(row.id)
+                else:
+                    oldest = db.session.query(Ticket.id).filter(Ticket.status == 'open')\
+                        .order_by(Ticket.created_at, Ticket.id).first()
+                    if oldest is None:
+                        break
+                    if mode == 'by-id':
+                        row = claim_ticket(member_id, ticket_id=oldest.id)
+                        if row is None:
+                            lost += 1
+                            continue
+                    else:
+                        ticket = db.session.get(Ticket, oldest.id)
+                        if ticket.status != 'open':
+                            db.session.rollback()
+                            lost += 1
+                            continue
+                        ticket.status = 'assigned'
+                        ticket.assigned_to = member_id
+                        db.session.add(ChatMessage(ticket_id=ticket.id, sender_id=member_id,
+                                                   message=WELCOME_MESSAGE, timestamp=datetime.now(IST)))
+                        db.session.commit()
+                    won.append(oldest.id)
+            except OperationalError:
+                # SQLite: another writer held the lock past the busy timeout
+                db.session.rollback()
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - began)
+    print(json.dumps([won, lost, errors, latencies]), flush=True)
+
+
+def spawn(*args):
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__)] + [str(arg) for arg in args],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+
+def last_line(process):
+    # The app may log to stdout too; the protocol line comes last
+    return [line for line in process.stdout.read().splitlines() if line.strip()][-1]
+
+
+def run(mode, members, tickets):
+    # Each process imports the app (and its eventlet monkey-patching) on its
+    # own; this one only coordinates
+    seeder = spawn('--seed', members, tickets)
+    member_ids = json.loads(last_line(seeder))
+    seeder.wait()
+    workers = [spawn('--worker', mode, member_id) for member_id in member_ids]
+    for worker in workers:
+        while worker.stdout.readline().strip() != 'ready':
+            pass
+    began = time.perf_counter()
+    for worker in workers:
+        worker.stdin.write('go\n')
+        worker.stdin.flush()
+    outcomes = [json.loads(last_line(worker)) for worker in workers]
+    elapsed = time.perf_counter() - began
+    for worker in workers:
+        worker.wait()
+
+    won = [ticket_id for outcome in outcomes for ticket_id in outcome[0]]
+    latencies = sorted(latency for outcome in outcomes for latency in outcome[3])
+    return {
+        'claims': len(won),
+        'double_claimed': len(won) - len(set(won)),
+        'lost': sum(outcome[1] for outcome in outcomes),
+        'errors': sum(outcome[2] for outcome in outcomes),
+        'claims_per_second': round(len(won) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 2) if latencies else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=8)
+    parser.add_argument('--tickets', type=int, default=400)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--seed', nargs=2, type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--worker', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        print(json.dumps(seed(*args.seed)), flush=True)
+        os._exit(0)  # Skip waiting on the app's background green threads
+    if args.worker:
+        member(args.worker[0], int(args.worker[1]))
+        os._exit(0)
+
+    print(f"{args.members} members, {args.tickets} tickets, {os.environ['DATABASE_URL'].split(':')[0]}")
+    for mode in args.modes:
+        result = run(mode, args.members, args.tickets)
+        print(f"{mode:10} " + '  '.join(f"{key} {value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Check that the streaming exports use flat memory as the table grows.
+
+    python benchmarks/bench_export_memory.py --sizes 5000 20000 80000
+
+For each size the chat_messages table is filled to that many rows and
+/api/admin/export/chats is read chunk by chunk; tracemalloc reports the
+peak Python allocation while streaming. The peak should stay roughly the
+same across sizes, where jsonify over .all() would grow linearly.
+
+Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from sqlalchemy import insert
+from app import app, db, User, Ticket, ChatMessage, IST, create_user_token, next_chat_seq
+from datetime import datetime
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    admin = User(first_name='Bench', last_name='Admin', email='bench-admin@example.com',
+                 phone='0000000001', password='x', role='admin')
+    db.session.add(admin)
+    db.session.flush()
+    ticket = Ticket(user_id=admin.id, created_by=admin.id, status='open', category='Technical',
+                    priority='High', subject='Bench', description='bench')
+    db.session.add(ticket)
+    db.session.commit()
+    return create_user_token(admin), ticket.id
+
+
+def fill(ticket_id, total, current):
+    now = datetime.now(IST)
+    # Bulk inserts skip the ORM hook that numbers messages, so reserve the seqs here
+    first_seq = next_chat_seq(db.session, ticket_id, total - current) - (total - current) + 1
+    rows = [{'ticket_id': ticket_id, 'sender_id': None, 'timestamp': now, 'is_system': False,
+             'message': f'message {i} ' + 'x' * 80, 'seq': first_seq + i - current} for i in range(current, total)]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(insert(ChatMessage), rows[start:start + 5000])
+    db.session.commit()
+
+
+def stream(client, token, fmt):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get('/api/admin/export/chats', query_string={'format': fmt},
+                          headers={'Authorization': f'Bearer {token}'}, buffered=False)
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000, 80000])
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    args = parser.parse_args()
+
+    with app.app_context():
+        token, ticket_id = seed()
+    client = app.test_client()
+    current = 0
+    for total in sorted(args.sizes):
+        with app.app_context():
+            fill(ticket_id, total, current)
+        current = total
+        size, peak, elapsed = stream(client, token, args.format)
+        print(f"{total:8} rows  {size / 1e6:7.1f} MB streamed  peak {peak / 1e6:6.2f} MB  "
+              f"{total / elapsed:8.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Measure the caller-side cost of a hot-path log line.
+
+    python benchmarks/bench_logging.py --records 50000
+
+Output goes to /dev/null so only the work done on the calling (hub) thread
+is timed: synchronous text logging as the app used to do it, the queue
+handler with the JSON formatter on the writer thread, a record dropped by
+sampling, and a record below the configured level.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eventlet
+eventlet.monkey_patch()
+
+from logging_config import configure_logging
+
+logger = logging.getLogger('bench')
+
+
+def per_call_us(records, level=logging.INFO, event='join'):
+    extra = {'event': event, 'ticket_id': '42', 'user_id': '7', 'sid': 'rhFuXyXq3qGctDywAAAA'}
+    start = time.perf_counter()
+    for i in range(records):
+        logger.log(level, "User %s joined room %s", i, '42', extra=extra)
+    return (time.perf_counter() - start) / records * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=50000)
+    args = parser.parse_args()
+
+    sys.stderr = open(os.devnull, 'w')
+    try:
+        configure_logging('INFO', fmt='text', async_=False)
+        sync_text = per_call_us(args.records)
+        listener = configure_logging('INFO', fmt='json', async_=True, sample_rates={'join': 0.1})
+        queued = per_call_us(args.records, event='connect')
+        sampled = per_call_us(args.records)
+        below_level = per_call_us(args.records, level=logging.DEBUG)
+        listener.stop()
+    finally:
+        sys.stderr = sys.__stderr__
+
+    print(f"sync text to stream      {sync_text:6.2f} us per record")
+    print(f"queued JSON              {queued:6.2f} us per record")
+    print(f"queued JSON, 1 in 10     {sampled:6.2f} us per record")
+    print(f"below level              {below_level:6.2f} us per record")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Measure how a login storm delays chat messages on the same process.
+
+    python benchmarks/bench_login_latency.py --logins 40
+
+A customer and a member share a ticket over two Socket.IO clients (the
+long-polling client from run_suite.py, against the real app). They take
+turns sending a chat message every --interval seconds. Each message is timed
+from when it was due to be sent to the other side receiving it, so a hub
+too busy to run the sender still counts against the messages it held up.
+Meanwhile --logins POST /api/auth/login requests arrive at once, and every
+message due before the last one answers is timed.
+
+It runs three times: with no logins for --baseline seconds, for reference;
+with pbkdf2 verified inline on the eventlet hub, as before PasswordHasher;
+and through PasswordHasher (native thread pool), as the app does now. The
+pool keeps the hub free, but the hashing threads still need CPU, so chat
+only stays fast when the host has cores to spare for them.
+
+Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sets up the database and imports the app
+from run_suite import PollingClient, create_users, summarize
+
+import eventlet
+from werkzeug.security import generate_password_hash, check_password_hash
+
+import app as chat_app
+from app import app, db, socketio, User
+from passwords import PasswordHasher, HASH_METHOD
+
+PASSWORD = 'correct horse battery staple'
+
+
+class InlineHasher:
+    """Verify on the calling green thread, blocking the hub while pbkdf2 runs."""
+
+    def verify(self, pwhash, password):
+        return check_password_hash(pwhash, password)
+
+
+def create_login_users(count):
+    # One hash shared by every account; verifying it costs the same either way
+    pwhash = generate_password_hash(PASSWORD, HASH_METHOD)
+    users = [User(first_name='Bench', last_name=f'Login {i}', role='user', password=pwhash,
+                  email=f'bench-login-{i}@example.com', phone=f'8{i:09d}') for i in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.email for user in users]
+
+
+def open_chat():
+    """A ticket with its owner and assignee connected and joined."""
+    http = app.test_client()
+    with app.app_context():
+        (user_id, user_token), = create_users('user', 1)
+        (member_id, member_token), = create_users('member', 1)
+    ticket_id = http.post('/api/tickets', json={
+        'category': 'Technical', 'priority': 'High', 'subject': 'Bench login', 'description': 'bench'
+    }, headers={'Authorization': f'Bearer {user_token}'}).get_json()['ticket_id']
+    http.post(f'/api/tickets/{ticket_id}/accept', headers={'Authorization': f'Bearer {member_token}'})
+
+    sides = []
+    for sender_id, token in ((user_id, user_token), (member_id, member_token)):
+        client = PollingClient(token)
+        client.expect('connect_success')()
+        joined = client.expect('joined', lambda data: data['room'] == str(ticket_id))
+        client.emit('join', {'ticket_id': ticket_id})
+        joined()
+        sides.append((sender_id, client))
+    return ticket_id, sides
+
+
+def run(hasher, emails, ticket_id, sides, interval, label, baseline=0):
+    chat_app.password_hasher = hasher
+    latencies, statuses, end = [], [], []
+
+    def converse():
+        k, due = 0, time.perf_counter()
+        while not end or due < end[0]:
+            (_, sender), (_, receiver) = sides[k % 2], sides[(k + 1) % 2]
+            text = f'{label}:{k}'
+            received = receiver.expect('message', lambda data, text=text: data['message'] == text)
+            sender.emit('message', {'ticket_id': ticket_id, 'message': text})
+            received_at, _ = received()
+            latencies.append((received_at - due) * 1000)
+            k += 1
+            due += interval
+            eventlet.sleep(max(0, due - time.perf_counter()))
+
+    def login(email):
+        response = app.test_client().post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+        statuses.append(response.status_code)
+
+    talker = eventlet.spawn(converse)
+    eventlet.sleep(interval * 5)  # a few messages before the storm
+    start = time.perf_counter()
+    pool = eventlet.GreenPool(max(len(emails), 1))
+    for _ in pool.imap(login, emails):
+        pass
+    if not emails:
+        eventlet.sleep(baseline)
+    end.append(time.perf_counter())
+    elapsed = end[0] - start
+    talker.wait()
+    return {
+        'chat_ms': summarize(latencies),
+        'elapsed': elapsed,
+        'ok': statuses.count(200),
+        'rejected': statuses.count(429),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--interval', type=float, default=0.01, help='seconds between chat messages')
+    parser.add_argument('--baseline', type=float, default=2.0, help='seconds of chat without logins')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--queue-timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    socketio.server.eio.start_service_task = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        emails = create_login_users(args.logins)
+    ticket_id, sides = open_chat()
+
+    pooled = PasswordHasher(concurrency=args.concurrency, queue_timeout=args.queue_timeout)
+    pooled.verify(generate_password_hash('warm up', HASH_METHOD), 'warm up')  # start the native threads
+    for label, hasher, storm in (('no logins', pooled, []), ('inline on hub', InlineHasher(), emails),
+                                 ('thread pool', pooled, emails)):
+        r = run(hasher, storm, ticket_id, sides, args.interval, label, args.baseline)
+        chat = r['chat_ms']
+        print(f"{label:14} chat p50 {chat['p50']:7.2f} ms  p95 {chat['p95']:7.2f} ms  p99 {chat['p99']:7.2f} ms  "
+              f"max {chat['max']:7.2f} ms  {chat['count']:4} messages  "
+              f"({r['ok']} logins in {r['elapsed']:.2f}s, {r['rejected']} rejected)")
+
+    for _, client in sides:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Compare chat message write throughput: per-message commit vs group commit.
+
+    python benchmarks/bench_message_writes.py --messages 2000 --concurrency 50
+
+Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+import eventlet
+from app import app, db, User, Ticket, IST, persist_chat_message, chat_write_buffer
+from datetime import datetime
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    customer = User(first_name='Bench', last_name='User', email='bench-user@example.com',
+                    phone='0000000001', password='x', role='user')
+    member = User(first_name='Bench', last_name='Member', email='bench-member@example.com',
+                  phone='0000000002', password='x', role='member')
+    db.session.add_all([customer, member])
+    db.session.flush()
+    tickets = [
+        Ticket(user_id=customer.id, created_by=customer.id, assigned_to=member.id, status='assigned',
+               category='Technical', priority='High', subject=f'Bench {i}', description='bench')
+        for i in range(10)
+    ]
+    db.session.add_all(tickets)
+    db.session.commit()
+    return customer.id, member.id, [t.id for t in tickets]
+
+
+def run_direct(n, concurrency, sender_id, tickets):
+    def send(i):
+        with app.app_context():
+            ticket = db.session.get(Ticket, tickets[i % len(tickets)])
+            persist_chat_message(ticket, sender_id, f'direct {i}')
+
+    pool = eventlet.GreenPool(concurrency)
+    start = time.perf_counter()
+    for _ in pool.imap(send, range(n)):
+        pass
+    return time.perf_counter() - start
+
+
+def run_batched(n, sender_id, tickets):
+    start = time.perf_counter()
+    for i in range(n):
+        chat_write_buffer.submit({
+            'ticket_id': tickets[i % len(tickets)],
+            'sender_id': sender_id,
+            'message': f'batched {i}',
+            'timestamp': datetime.now(IST),
+            'client_id': str(i),
+            'sid': None
+        })
+    # pending() counts the batch the worker is still committing
+    while chat_write_buffer.pending():
+        eventlet.sleep(0.001)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    with app.app_context():
+        customer_id, _, tickets = seed()
+
+    direct = run_direct(args.messages, args.concurrency, customer_id, tickets)
+    batched = run_batched(args.messages, customer_id, tickets)
+
+    print(f"database:          {app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1]}")
+    print(f"per-message commit: {args.messages / direct:10.1f} msg/s ({direct:.2f}s)")
+    print(f"group commit:       {args.messages / batched:10.1f} msg/s ({batched:.2f}s, "
+          f"batch<={chat_write_buffer.max_batch}, delay<={chat_write_buffer.max_delay}s)")
+
+
+if __name__ == '__main__':
+    main()
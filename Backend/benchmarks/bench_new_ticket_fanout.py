@@ -0,0 +1,85 @@
+"""Count Socket.IO frames sent per created ticket: global broadcast vs role rooms.
+
+    python benchmarks/bench_new_ticket_fanout.py --users 5000
+
+Connections are registered directly with a Socket.IO server's client manager
+and engine.io sends are counted, so no network or database is involved.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socketio
+from app import broadcast_rooms, new_ticket_rooms, user_room
+
+CATEGORIES = ['Technical', 'Billing', 'General']
+
+
+def build_server(users, member_share, admin_share):
+    server = socketio.Server(async_mode='threading')
+    frames = [0]
+
+    def count(*args, **kwargs):
+        frames[0] += 1
+
+    # Older python-socketio sends through eio.send, newer through eio.send_packet
+    server.eio.send = count
+    server.eio.send_packet = count
+
+    rng = random.Random(42)
+    for n in range(users):
+        draw = rng.random()
+        if draw < admin_share:
+            role, skills = 'admin', []
+        elif draw < admin_share + member_share:
+            role = 'member'
+            skills = rng.sample(CATEGORIES, rng.randint(0, 2))
+        else:
+            role, skills = 'user', []
+        eio_sid = f'eio{n}'
+        sid = server.manager.connect(eio_sid, '/')
+        for room in [user_room(n)] + broadcast_rooms(role, skills):
+            server.manager.enter_room(sid, '/', room, eio_sid=eio_sid)
+    return server, frames
+
+
+def measure(server, frames, tickets, routed):
+    frames[0] = 0
+    start = time.perf_counter()
+    for n in range(tickets):
+        ticket = SimpleNamespace(category=CATEGORIES[n % len(CATEGORIES)],
+                                 visibility='category' if n % 2 else 'all_members')
+        payload = {'ticket_id': n, 'category': ticket.category, 'priority': 'High'}
+        if routed:
+            for room in new_ticket_rooms(ticket):
+                server.emit('new_ticket', payload, room=room)
+        else:
+            server.emit('new_ticket', payload)
+    elapsed = time.perf_counter() - start
+    return frames[0] / tickets, elapsed / tickets * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--member-share', type=float, default=0.08)
+    parser.add_argument('--admin-share', type=float, default=0.01)
+    parser.add_argument('--tickets', type=int, default=200)
+    args = parser.parse_args()
+
+    server, frames = build_server(args.users, args.member_share, args.admin_share)
+    broadcast_frames, broadcast_ms = measure(server, frames, args.tickets, routed=False)
+    routed_frames, routed_ms = measure(server, frames, args.tickets, routed=True)
+
+    print(f"connected sockets: {args.users}")
+    print(f"global broadcast:  {broadcast_frames:8.1f} frames/ticket  {broadcast_ms:7.3f} ms/ticket")
+    print(f"role/category:     {routed_frames:8.1f} frames/ticket  {routed_ms:7.3f} ms/ticket")
+
+
+if __name__ == '__main__':
+    main()
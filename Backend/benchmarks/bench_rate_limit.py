@@ -0,0 +1,70 @@
+"""Measure what the socket rate limiter costs per inbound event.
+
+    python benchmarks/bench_rate_limit.py
+
+Each path is timed in a tight loop: an event that fits its socket and user
+buckets, one that only has a socket limit, one that is rejected, and the
+rate_limited() wrapper around a handler compared to calling it bare. The
+buckets' memory is measured last, for one bucket per socket and event.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import RateLimited, RateLimiter
+
+
+def loop_ns(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200000)
+    parser.add_argument('--sockets', type=int, default=100000)
+    args = parser.parse_args()
+
+    # Rates high enough that the allowed paths never run dry
+    limiter = RateLimiter(sid_limits={'message': (1e12, 1e12), 'typing': (1e12, 1e12)},
+                          user_limits={'message': (1e12, 1e12)})
+    sid = 'rhFuXyXq3qGctDywAAAA'
+    print(f"socket and user      {loop_ns(lambda: limiter.acquire('message', sid, 7), args.iterations):8.0f} ns per event")
+    print(f"socket only          {loop_ns(lambda: limiter.acquire('typing', sid, 7), args.iterations):8.0f} ns per event")
+
+    dry = RateLimiter(sid_limits={'message': (1e-9, 1)})
+    dry.acquire('message', sid, 7)
+
+    def rejected():
+        try:
+            dry.acquire('message', sid, 7)
+        except RateLimited:
+            pass
+    print(f"rejected             {loop_ns(rejected, args.iterations):8.0f} ns per event")
+
+    def handler(data):
+        return None
+    wrapped = limiter.limit('message', lambda: (sid, 7), lambda e, data: None)(handler)
+    bare_call = loop_ns(lambda: handler(None), args.iterations)
+    print(f"wrapped handler      {loop_ns(lambda: wrapped(None), args.iterations) - bare_call:8.0f} ns per event")
+
+    limiter = RateLimiter(sid_limits={'message': (5, 10)})
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(args.sockets):
+        limiter.acquire('message', f'sid{i:016d}', None)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # The sid strings themselves belong to the server's socket table, not the limiter
+    sid_bytes = sys.getsizeof(f'sid{0:016d}')
+    print(f"memory               {used / args.sockets - sid_bytes:8.0f} bytes per bucket ({args.sockets} sockets)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+"""Offline load test for the chat backend, with results written as JSON.
+
+    python benchmarks/run_suite.py --users 50 --members 10 --messages 20 \\
+        --sizes 1000 5000 20000 --output before.json
+    python benchmarks/run_suite.py --compare before.json after.json
+
+Everything runs in this process against the real app. REST calls go through
+the Flask test client. Socket.IO clients speak Engine.IO long-polling to the
+app's WSGI stack, one green thread per client, so handlers, rooms, packet
+encoding and the per-socket queues are all production code; only the
+network is missing, and latencies are a floor for what a remote client sees.
+
+  memory  heap and RSS growth per connected, idle socket
+  chat    --users users and --members members connect, each user opens a
+          ticket, members accept them round-robin, both sides join the room
+          and trade --messages messages each. Reports the round trip from
+          one side's emit to the other side receiving it, and messages/s.
+  rest    GET /api/tickets, /api/chats/<id> and /api/admin/stats after
+          growing the tables to each of --sizes tickets and chat messages
+
+Runs against DATABASE_URL, or a throwaway SQLite file when it is unset.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+# Simulated clients send faster than any person would; measure the server, not the limiter
+os.environ.setdefault('RATE_LIMITS_SID', '')
+os.environ.setdefault('RATE_LIMITS_USER', '')
+
+import eventlet
+from eventlet.event import Event
+from sqlalchemy import insert, func
+from app import (app, db, socketio, User, Ticket, ChatMessage, IST, create_user_token,
+                 next_chat_seq, rebuild_ticket_stats)
+
+SOCKETIO_PATH = '/socket.io/'
+WAIT_TIMEOUT = 10
+
+
+class PollingClient:
+    """Just enough of a Socket.IO client to chat over Engine.IO v4 polling."""
+
+    def __init__(self, token, listen=True):
+        self._http = app.test_client()
+        response = self._http.get(SOCKETIO_PATH, query_string={'EIO': '4', 'transport': 'polling', 'token': token})
+        self.sid = json.loads(response.get_data(as_text=True)[1:])['sid']
+        self._waiters = []
+        self._send('40')
+        self._reader = eventlet.spawn(self._read) if listen else None
+
+    def _query(self):
+        return {'EIO': '4', 'transport': 'polling', 'sid': self.sid}
+
+    def _send(self, packet):
+        # A separate test client, so sends never wait behind the pending poll
+        app.test_client().post(SOCKETIO_PATH, query_string=self._query(), data=packet)
+
+    def _read(self):
+        while True:
+            response = self._http.get(SOCKETIO_PATH, query_string=self._query())
+            if response.status_code != 200:
+                return
+            for packet in response.get_data(as_text=True).split('\x1e'):
+                if packet == '2':
+                    self._send('3')
+                elif packet == '1':
+                    return
+                elif packet.startswith('42'):
+                    event, *args = json.loads(packet[2:])
+                    self._dispatch(time.perf_counter(), event, args[0] if args else None)
+
+    def _dispatch(self, received_at, event, data):
+        for entry in self._waiters:
+            name, match, waiter = entry
+            if name == event and match(data):
+                self._waiters.remove(entry)
+                waiter.send((received_at, data))
+                return
+
+    def emit(self, event, data):
+        self._send('42' + json.dumps([event, data]))
+
+    def expect(self, event, match=lambda data: True):
+        """Register for the next matching event; call before whatever triggers it.
+
+        Returns a function that waits for the event and gives back its
+        arrival time and payload. Events nobody expects are dropped.
+        """
+        waiter = Event()
+        self._waiters.append((event, match, waiter))
+
+        def wait():
+            with eventlet.Timeout(WAIT_TIMEOUT):
+                return waiter.wait()
+        return wait
+
+    def close(self):
+        self._send('1')
+        if self._reader is not None:
+            self._reader.kill()
+
+
+def summarize(samples):
+    """count/mean/p50/p95/p99/max of latencies in milliseconds."""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+
+    return {
+        'count': len(ordered),
+        'mean': round(statistics.fmean(ordered), 3),
+        'p50': round(percentile(50), 3),
+        'p95': round(percentile(95), 3),
+        'p99': round(percentile(99), 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+def create_users(role, count):
+    start = db.session.query(func.count(User.id)).scalar()
+    users = [User(first_name='Bench', last_name=f'{role.title()} {start + i}', role=role, password='x',
+                  email=f'bench-{role}-{start + i}@example.com', phone=f'9{start + i:09d}')
+             for i in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return [(user.id, create_user_token(user)) for user in users]
+
+
+def bench_memory(connections):
+    with app.app_context():
+        tokens = [token for _, token in create_users('user', connections)]
+    # One socket first, so lazily built server state is not charged to the rest
+    PollingClient(tokens.pop(), listen=False)
+    tracemalloc.start()
+    heap_before, rss_before = tracemalloc.get_traced_memory()[0], rss_bytes()
+    clients = [PollingClient(token, listen=False) for token in tokens]
+    heap = (tracemalloc.get_traced_memory()[0] - heap_before) / len(clients)
+    rss = (rss_bytes() - rss_before) / len(clients) if rss_before is not None else None
+    tracemalloc.stop()
+    for client in clients:
+        client.close()
+    return {'connections': len(clients), 'heap_bytes_per_connection': round(heap),
+            'rss_bytes_per_connection': round(rss) if rss is not None else None}
+
+
+def bench_chat(users, members, messages):
+    http = app.test_client()
+    with app.app_context():
+        user_tokens = create_users('user', users)
+        member_tokens = create_users('member', members)
+
+    connect_times = []
+
+    def connect(entry):
+        start = time.perf_counter()
+        client = PollingClient(entry[1])
+        client.expect('connect_success')()
+        connect_times.append((time.perf_counter() - start) * 1000)
+        return entry[0], entry[1], client
+
+    pool = eventlet.GreenPool(users + members)
+    user_clients = list(pool.imap(connect, user_tokens))
+    member_clients = list(pool.imap(connect, member_tokens))
+
+    pairs = []
+    for n, (user_id, user_token, user_client) in enumerate(user_clients):
+        member_id, member_token, member_client = member_clients[n % members]
+        ticket_id = http.post('/api/tickets', json={
+            'category': 'Technical', 'priority': 'High', 'subject': f'Bench {n}', 'description': 'bench'
+        }, headers={'Authorization': f'Bearer {user_token}'}).get_json()['ticket_id']
+        http.post(f'/api/tickets/{ticket_id}/accept', headers={'Authorization': f'Bearer {member_token}'})
+        pairs.append((ticket_id, (user_id, user_client), (member_id, member_client)))
+
+    for ticket_id, (_, user_client), (_, member_client) in pairs:
+        for client in (user_client, member_client):
+            joined = client.expect('joined', lambda data, room=str(ticket_id): data['room'] == room)
+            client.emit('join', {'ticket_id': ticket_id})
+            joined()
+
+    round_trips = []
+
+    def converse(pair):
+        ticket_id, user, member = pair
+        for k in range(messages):
+            for (sender_id, sender), (_, receiver) in ((user, member), (member, user)):
+                text = f'{ticket_id}:{sender_id}:{k}'
+                received = receiver.expect('message', lambda data: data['message'] == text)
+                sent_at = time.perf_counter()
+                sender.emit('message', {'ticket_id': ticket_id, 'sender_id': sender_id, 'message': text})
+                received_at, _ = received()
+                round_trips.append((received_at - sent_at) * 1000)
+
+    start = time.perf_counter()
+    for _ in pool.imap(converse, pairs):
+        pass
+    elapsed = time.perf_counter() - start
+
+    for _, _, client in user_clients + member_clients:
+        client.close()
+    return {
+        'users': users,
+        'members': members,
+        'messages': len(round_trips),
+        'messages_per_second': round(len(round_trips) / elapsed, 1),
+        'connect_ms': summarize(connect_times),
+        'round_trip_ms': summarize(round_trips),
+    }
+
+
+def grow(size, hot_ticket_id, owner_id):
+    """Bring tickets and the hot ticket's chat up to size rows each."""
+    tickets = db.session.query(func.count(Ticket.id)).scalar()
+    now = datetime.now(IST)
+    rows = [{'user_id': owner_id, 'created_by': owner_id, 'status': 'open', 'category': 'Technical',
+             'priority': 'High', 'subject': f'Bench {i}', 'description': 'bench', 'visibility': 'all_members',
+             'created_at': now, 'message_count': 0} for i in range(tickets, size)]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(insert(Ticket), rows[start:start + 5000])
+    chat = db.session.query(func.count(ChatMessage.id)).filter(ChatMessage.ticket_id == hot_ticket_id).scalar()
+    # Bulk inserts skip the ORM hook that numbers messages, so reserve the seqs here
+    first_seq = next_chat_seq(db.session, hot_ticket_id, size - chat) - (size - chat) + 1
+    rows = [{'ticket_id': hot_ticket_id, 'sender_id': owner_id, 'message': f'message {i}', 'timestamp': now,
+             'is_system': False, 'seq': first_seq + i - chat} for i in range(chat, size)]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(insert(ChatMessage), rows[start:start + 5000])
+    rebuild_ticket_stats()
+    db.session.commit()
+
+
+def bench_rest(sizes, requests):
+    http = app.test_client()
+    with app.app_context():
+        (admin_id, admin_token), = create_users('admin', 1)
+        hot_ticket = Ticket(user_id=admin_id, created_by=admin_id, status='open', category='Technical',
+                            priority='High', subject='Bench hot', description='bench')
+        db.session.add(hot_ticket)
+        db.session.commit()
+        hot_ticket_id = hot_ticket.id
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    endpoints = {
+        'tickets_page': '/api/tickets?limit=50',
+        'tickets_all': '/api/tickets',
+        'chats_page': f'/api/chats/{hot_ticket_id}?limit=50',
+        'chats_all': f'/api/chats/{hot_ticket_id}',
+        'admin_stats': '/api/admin/stats',
+    }
+
+    results = []
+    for size in sorted(sizes):
+        with app.app_context():
+            grow(size, hot_ticket_id, admin_id)
+        timings = {}
+        for name, url in endpoints.items():
+            http.get(url, headers=headers)  # warm caches and the connection pool
+            samples = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = http.get(url, headers=headers)
+                samples.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, (url, response.status_code)
+            timings[name] = summarize(samples)
+        results.append({'rows': size, 'latency_ms': timings})
+    return results
+
+
+def git_revision():
+    try:
+        root = os.path.dirname(os.path.abspath(__file__))
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def flatten(data, prefix=''):
+    """{'a': {'b': 1}} -> {'a.b': 1}; lists of size runs are keyed by their row count."""
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten(value, f'{prefix}{key}.'))
+    elif isinstance(data, list):
+        for item in data:
+            flat.update(flatten(item, f"{prefix}{item.get('rows', '?')}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix.rstrip('.')] = data
+    return flat
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    old_flat, new_flat = flatten(old['results']), flatten(new['results'])
+    for key in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[key], new_flat[key]
+        change = f'{(after - before) / before * 100:+7.1f}%' if before else '       '
+        print(f'{key:55} {before:12.3f} {after:12.3f} {change}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--members', type=int, default=10)
+    parser.add_argument('--messages', type=int, default=20, help='messages each side sends per ticket')
+    parser.add_argument('--connections', type=int, default=500, help='idle sockets for the memory figure')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--requests', type=int, default=20, help='timed requests per endpoint and size')
+    parser.add_argument('--scenarios', nargs='+', choices=['memory', 'chat', 'rest'],
+                        default=['memory', 'chat', 'rest'])
+    parser.add_argument('--output', default='suite-results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='diff two result files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Timed-out sockets are not a concern here, and engine.io's monitor
+    # task is a thread that never exits
+    socketio.server.eio.start_service_task = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+    results = {}
+    if 'memory' in args.scenarios:
+        results['memory'] = bench_memory(args.connections)
+        print(f"memory  {results['memory']}")
+    if 'chat' in args.scenarios:
+        results['chat'] = bench_chat(args.users, args.members, args.messages)
+        print(f"chat    {results['chat']}")
+    if 'rest' in args.scenarios:
+        results['rest'] = bench_rest(args.sizes, args.requests)
+        for run in results['rest']:
+            print(f"rest    {run['rows']:>7} rows  " +
+                  '  '.join(f"{name} p50 {t['p50']:.1f}ms" for name, t in run['latency_ms'].items()))
+
+    commit, dirty = git_revision()
+    with open(args.output, 'w') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'dirty': dirty,
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':')[0],
+                'params': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
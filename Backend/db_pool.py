@@ -0,0 +1,120 @@
+import os
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from metrics import Histogram
+
+# Checkout wait buckets in seconds, upper bounds
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Counters fed by pool events and by InstrumentedQueuePool."""
+
+    def __init__(self):
+        self.checkout_wait = Histogram(WAIT_BUCKETS)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.connect_errors = 0
+        self.checkout_timeouts = 0
+        self.disconnects = 0
+        self.invalidations = 0
+        self.engine = None
+
+    def attach(self, engine):
+        self.engine = engine
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+        event.listen(engine, 'handle_error', self._on_error)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    def _on_error(self, context):
+        if context.is_disconnect:
+            self.disconnects += 1
+
+    def snapshot(self):
+        pool = self.engine.pool if self.engine is not None else None
+        data = {
+            'pool_class': type(pool).__name__ if pool is not None else None,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'connects': self.connects,
+            'connect_errors': self.connect_errors,
+            'checkout_timeouts': self.checkout_timeouts,
+            'disconnects': self.disconnects,
+            'invalidations': self.invalidations,
+            'checkout_wait': {
+                'count': self.checkout_wait.count,
+                'sum': self.checkout_wait.sum,
+                'buckets': [{'le': str(bound), 'count': count}
+                            for bound, count in self.checkout_wait.cumulative()]
+            }
+        }
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout()
+            })
+        return data
+
+
+metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.checkout_timeouts += 1
+            raise
+        except Exception:
+            metrics.connect_errors += 1
+            raise
+        finally:
+            metrics.checkout_wait.observe(time.perf_counter() - start)
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def engine_options_from_env(database_url):
+    """SQLALCHEMY_ENGINE_OPTIONS built from DB_POOL_* environment variables.
+
+    SQLite gets no pool sizing; its pools are per-thread or single-connection.
+    """
+    if database_url.startswith('sqlite'):
+        return {}
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_use_lifo': _env_bool('DB_POOL_USE_LIFO', False),
+    }
@@ -0,0 +1,192 @@
+import heapq
+import itertools
+import logging
+
+import eventlet
+from eventlet.queue import LightQueue, Empty
+
+logger = logging.getLogger(__name__)
+
+ANY = None            # Tickets any member may take, and the heap of all members
+GENERALISTS = '*'     # Members without skills, who take tickets of every category
+
+
+class _Member:
+    __slots__ = ('skills', 'load', 'seq')
+
+    def __init__(self, skills, load):
+        self.skills = skills
+        self.load = load
+        self.seq = None
+
+
+class Dispatcher:
+    """Pairs open tickets with online members, least loaded first.
+
+    Tickets wait in heaps ordered by (priority rank, id), ids standing in
+    for age: one heap for tickets any member may take and one per category
+    for tickets restricted to that category. Online members sit in heaps
+    ordered by (assigned tickets, seq): one of everyone, one per skill, and
+    one of members without skills. A member's entries are pushed again
+    whenever their load changes, and outdated entries are dropped when they
+    surface, so each change and each decision is O(log n), times the
+    handful of categories.
+
+    Only the top of each ticket heap needs looking at: every ticket in a
+    heap can go to the same members, so if its top cannot be placed, nothing
+    under it can. Members at ``max_load`` take nothing.
+
+    A green thread runs ``dispatch`` whenever ``wake`` is called, and
+    ``reload`` every ``resync_interval`` seconds. ``assign(ticket_id,
+    member_id)`` makes each decision stick and returns False if the ticket
+    was taken meanwhile. Load changes come back through ``adjust_load``.
+    ``reload()`` returns the database's open tickets, as (id, rank,
+    category or ANY), and {member id: assigned tickets}.
+    """
+
+    def __init__(self, assign=None, reload=None, max_load=5, resync_interval=60.0):
+        self.assign = assign
+        self.reload = reload
+        self.max_load = max_load
+        self.resync_interval = resync_interval
+        self.assigned = 0
+        self._tickets = {}        # ticket id -> (rank, category or ANY)
+        self._ticket_heaps = {}   # category or ANY -> [(rank, ticket id)]
+        self._members = {}        # online member id -> _Member
+        self._member_heaps = {}   # skill, GENERALISTS or ANY -> [(load, seq, member id)]
+        self._loads = {}          # member id -> assigned tickets, online or not
+        self._seq = itertools.count()
+        self._signal = LightQueue()
+        self._worker = None
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def online(self):
+        return len(self._members)
+
+    def add_ticket(self, ticket_id, rank, category=ANY):
+        if ticket_id in self._tickets:
+            return
+        self._tickets[ticket_id] = (rank, category)
+        heapq.heappush(self._ticket_heaps.setdefault(category, []), (rank, ticket_id))
+
+    def discard_ticket(self, ticket_id):
+        # Its heap entry is dropped when it surfaces
+        self._tickets.pop(ticket_id, None)
+
+    def _push_member(self, member_id, member):
+        member.seq = next(self._seq)
+        entry = (member.load, member.seq, member_id)
+        for name in (ANY,) + (tuple(member.skills) or (GENERALISTS,)):
+            heapq.heappush(self._member_heaps.setdefault(name, []), entry)
+
+    def member_online(self, member_id, skills=()):
+        if member_id not in self._members:
+            member = self._members[member_id] = _Member(frozenset(skills), self._loads.get(member_id, 0))
+            self._push_member(member_id, member)
+
+    def member_offline(self, member_id):
+        self._members.pop(member_id, None)
+
+    def adjust_load(self, member_id, delta):
+        load = self._loads[member_id] = max(0, self._loads.get(member_id, 0) + delta)
+        member = self._members.get(member_id)
+        if member is not None:
+            member.load = load
+            self._push_member(member_id, member)
+
+    def _top_ticket(self, category):
+        heap = self._ticket_heaps[category]
+        while heap:
+            rank, ticket_id = heap[0]
+            if self._tickets.get(ticket_id) == (rank, category):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _top_member(self, name):
+        heap = self._member_heaps.get(name)
+        while heap:
+            load, seq, member_id = heap[0]
+            member = self._members.get(member_id)
+            if member is not None and member.seq == seq:
+                return heap[0] if load < self.max_load else None
+            heapq.heappop(heap)
+        return None
+
+    def _best_member(self, category):
+        if category is ANY:
+            return self._top_member(ANY)
+        candidates = [entry for entry in (self._top_member(category), self._top_member(GENERALISTS)) if entry]
+        return min(candidates) if candidates else None
+
+    def next_assignment(self):
+        """The most urgent ticket that can be placed and its least loaded member, or None.
+
+        The ticket leaves the queue; the member's load is only raised once
+        the caller reports the assignment through adjust_load.
+        """
+        best = None
+        for category in self._ticket_heaps:
+            ticket = self._top_ticket(category)
+            if ticket is None or (best is not None and ticket >= best[0]):
+                continue
+            member = self._best_member(category)
+            if member is not None:
+                best = (ticket, member, category)
+        if best is None:
+            return None
+        (_, ticket_id), (_, _, member_id), category = best
+        heapq.heappop(self._ticket_heaps[category])
+        del self._tickets[ticket_id]
+        return ticket_id, member_id
+
+    def resync(self, tickets, loads):
+        """Replace the queue and loads with ``reload()``'s view of the database."""
+        tickets = list(tickets)
+        newest = max((ticket[0] for ticket in tickets), default=0)
+        # Tickets created while the reload was reading are kept
+        added = [(ticket_id,) + entry for ticket_id, entry in self._tickets.items() if ticket_id > newest]
+        self._tickets = {}
+        self._ticket_heaps = {}
+        for ticket in tickets + added:
+            self.add_ticket(*ticket)
+        self._loads = dict(loads)
+        self._member_heaps = {}
+        for member_id, member in self._members.items():
+            member.load = self._loads.get(member_id, 0)
+            self._push_member(member_id, member)
+
+    def dispatch(self):
+        """Assign until nothing more can be placed; returns how many were assigned."""
+        assigned = 0
+        while True:
+            pair = self.next_assignment()
+            if pair is None:
+                break
+            if self.assign(*pair):
+                assigned += 1
+        self.assigned += assigned
+        return assigned
+
+    def wake(self):
+        if self._worker is None:
+            self._worker = eventlet.spawn(self._run)
+        if not self._signal.qsize():
+            self._signal.put(None)
+
+    def _run(self):
+        resync = True
+        while True:
+            try:
+                if resync:
+                    self.resync(*self.reload())
+                self.dispatch()
+            except Exception as e:
+                logger.error("Error dispatching tickets: %s", e)
+            try:
+                self._signal.get(timeout=self.resync_interval)
+                resync = False
+            except Empty:
+                resync = True
@@ -0,0 +1,143 @@
+"""Logging set up from the environment.
+
+Records are handed to a queue and formatted and written by a native thread,
+so a burst of log lines costs the eventlet hub little more than building the
+LogRecord. Messages use %-style arguments and are only interpolated on that
+thread, after the level check and sampling have already let them through.
+Arguments must therefore not be mutated after the logging call.
+
+Records may carry ``ticket_id``, ``user_id`` and ``sid`` (pass them with
+``extra=``), which the JSON formatter emits as top-level fields, and an
+``event`` name that sampling keys on.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import sys
+import time
+
+from eventlet import patcher
+
+# The listener must be a real OS thread blocking on a real queue; the
+# monkey-patched versions would put it back on the hub.
+_native_threading = patcher.original('threading')
+_native_queue = patcher.original('queue')
+
+CONTEXT_FIELDS = ('event', 'ticket_id', 'user_id', 'sid')
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and context fields."""
+
+    def format(self, record):
+        data = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS + ('sampled',):
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one record in N for each ``event`` listed in ``rates``.
+
+    ``rates`` maps event names to the fraction to keep (0.01 keeps every
+    hundredth). Kept records get ``sampled=N`` so counts can be scaled back.
+    Records without an event, and warnings and above, always pass.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.every = {name: max(1, round(1 / rate)) if rate > 0 else 0 for name, rate in rates.items()}
+        self.seen = dict.fromkeys(self.every, 0)
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        every = self.every.get(event)
+        if every is None or record.levelno >= logging.WARNING:
+            return True
+        if every == 0:
+            return False
+        self.seen[event] += 1
+        if self.seen[event] % every:
+            return False
+        record.sampled = every
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records without formatting them on the calling thread.
+
+    The stock QueueHandler interpolates the message before enqueueing; here
+    only the traceback is rendered eagerly, since it refers to live frames.
+    """
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self.queue.put_nowait(record)
+
+
+class NativeQueueListener(logging.handlers.QueueListener):
+    def start(self):
+        self._thread = _native_threading.Thread(target=self._monitor, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+def parse_sample_rates(spec):
+    """``"message=0.01,join=0.1"`` -> ``{'message': 0.01, 'join': 0.1}``"""
+    rates = {}
+    for part in (spec or '').split(','):
+        if '=' in part:
+            name, rate = part.split('=', 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(level='INFO', fmt='json', async_=True, sample_rates=None):
+    """Install the root handler and return the queue listener, if any."""
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    # Skip LogRecord fields nothing here prints. Under eventlet,
+    # threading.current_thread() goes through the patcher and was the
+    # largest single cost of creating a record; the caller lookup walks the
+    # stack. See "Optimization" in the logging HOWTO.
+    logging.logThreads = False
+    logging.logMultiprocessing = False
+    logging._srcfile = None
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    listener = None
+    if async_:
+        listener = NativeQueueListener(_native_queue.SimpleQueue(), handler, respect_handler_level=True)
+        handler = NonBlockingQueueHandler(listener.queue)
+        listener.start()
+        atexit.register(listener.stop)
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    root.addHandler(handler)
+    return listener
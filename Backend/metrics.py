@@ -0,0 +1,243 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+There is no client library dependency: counters and histograms are plain
+attributes bumped from green threads (eventlet never preempts between the
+read and the write), and ``Registry.render`` formats them on scrape. Values
+that already live elsewhere, such as pool or cache statistics, are exposed
+through collector callbacks that only run at scrape time.
+"""
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Seconds, upper bounds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total, out = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+
+class Counter:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Family:
+    """A named metric with one child per combination of label values."""
+
+    def __init__(self, name, documentation, kind, labelnames=(), buckets=LATENCY_BUCKETS, collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self.collect = collect
+        self._children = {}
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            child = Histogram(self.buckets) if self.kind == 'histogram' else Counter()
+            self._children[values] = child
+        return child
+
+    def bind(self, child, *values):
+        """Expose an existing Histogram or Counter under these label values."""
+        self._children[values] = child
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        if self.collect is not None:
+            for values, value in self.collect():
+                lines.append(f'{self.name}{_labels(self.labelnames, values)} {_number(value)}')
+            return lines
+        for values, child in list(self._children.items()):
+            if self.kind == 'histogram':
+                for bound, count in child.cumulative():
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f'{self.name}_bucket{_labels(self.labelnames, values, le)} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.labelnames, values)} {_number(child.sum)}')
+                lines.append(f'{self.name}_count{_labels(self.labelnames, values)} {child.count}')
+            else:
+                lines.append(f'{self.name}{_labels(self.labelnames, values)} {_number(child.value)}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._families = []
+
+    def _add(self, family):
+        self._families.append(family)
+        return family
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Family(name, documentation, 'counter', labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Family(name, documentation, 'histogram', labelnames, buckets))
+
+    def collector(self, name, documentation, collect, kind='gauge', labelnames=()):
+        """A metric whose ``(label_values, value)`` pairs come from ``collect()`` at scrape time."""
+        return self._add(Family(name, documentation, kind, labelnames, collect=collect))
+
+    def render(self):
+        lines = []
+        for family in self._families:
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
+
+
+class Instrumentation:
+    """Request, query, Socket.IO handler and emit metrics for the app."""
+
+    def __init__(self, registry, enabled=True):
+        self.registry = registry
+        self.enabled = enabled
+        self.http_duration = registry.histogram(
+            'http_request_duration_seconds', 'Flask request latency by route', ('method', 'route'))
+        self.http_requests = registry.counter(
+            'http_requests_total', 'Flask requests by route and status', ('method', 'route', 'status'))
+        self.http_db_queries = registry.histogram(
+            'http_request_db_queries', 'Database queries issued per request', ('route',), QUERY_COUNT_BUCKETS)
+        self.http_db_seconds = registry.histogram(
+            'http_request_db_seconds', 'Time spent in database queries per request', ('route',))
+        self.db_query_duration = registry.histogram(
+            'db_query_duration_seconds', 'Duration of every database query, background work included').labels()
+        self.socket_duration = registry.histogram(
+            'socketio_event_duration_seconds', 'Socket.IO handler latency by event', ('event',))
+        self.socket_errors = registry.counter(
+            'socketio_event_errors_total', 'Socket.IO handlers that raised', ('event',))
+        self.emits = registry.counter(
+            'socketio_emits_total', 'emit() calls by event name', ('event',))
+        self.emit_recipients = registry.counter(
+            'socketio_emit_recipients_total', 'Packets delivered to sockets on this worker by event name', ('event',))
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        # [start, queries, seconds in queries]; one g lookup per query
+        g._metrics = [time.perf_counter(), 0, 0.0]
+
+    def _after_request(self, response):
+        state = g.pop('_metrics', None)
+        if state is not None:
+            start, queries, db_seconds = state
+            route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+            method = request.method
+            self.http_duration.labels(method, route).observe(time.perf_counter() - start)
+            self.http_requests.labels(method, route, response.status_code).inc()
+            self.http_db_queries.labels(route).observe(queries)
+            self.http_db_seconds.labels(route).observe(db_seconds)
+        return response
+
+    def watch_engine(self, engine):
+        if not self.enabled:
+            return
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        self.db_query_duration.observe(elapsed)
+        if has_request_context():
+            state = g.get('_metrics')
+            if state is not None:
+                state[1] += 1
+                state[2] += elapsed
+
+    def watch_socketio(self, server):
+        """Count emits and their per-socket deliveries on a socketio.Server.
+
+        Deliveries are counted where the manager hands a packet to a local
+        socket, so with a message queue each worker reports its own share.
+        """
+        if not self.enabled:
+            return
+        emit, emit_internal = server.emit, server._emit_internal
+
+        @wraps(emit)
+        def counted_emit(event, *args, **kwargs):
+            self.emits.labels(event).inc()
+            return emit(event, *args, **kwargs)
+
+        @wraps(emit_internal)
+        def counted_emit_internal(sid, event, *args, **kwargs):
+            self.emit_recipients.labels(event).inc()
+            return emit_internal(sid, event, *args, **kwargs)
+
+        server.emit = counted_emit
+        server._emit_internal = counted_emit_internal
+
+    def timed(self, event_name):
+        """Decorator recording a Socket.IO handler's latency under ``event_name``."""
+        def decorator(handler):
+            if not self.enabled:
+                return handler
+            histogram = self.socket_duration.labels(event_name)
+            errors = self.socket_errors.labels(event_name)
+
+            @wraps(handler)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return handler(*args, **kwargs)
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
@@ -0,0 +1,30 @@
+"""ticket listing indexes for keyset pagination
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tickets_created_at_id', 'tickets', ['created_at', 'id'])
+    op.create_index('ix_tickets_user_id_created_at_id', 'tickets', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_tickets_status_created_at_id', 'tickets', ['status', 'created_at', 'id'])
+    op.create_index('ix_tickets_assigned_to_created_at_id', 'tickets', ['assigned_to', 'created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_tickets_assigned_to_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_status_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_user_id_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_created_at_id', table_name='tickets')
@@ -0,0 +1,24 @@
+"""chat message (ticket_id, id) index for incremental history
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_chat_messages_ticket_id_id', 'chat_messages', ['ticket_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_chat_messages_ticket_id_id', table_name='chat_messages')
@@ -0,0 +1,85 @@
+"""replace per-message unread rows with per-(user, ticket) read cursors
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tickets', sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'ticket_read_cursors',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('ticket_id', sa.Integer(), sa.ForeignKey('tickets.id'), primary_key=True),
+        sa.Column('last_read_message_id', sa.Integer(), nullable=True),
+        sa.Column('read_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+    # Unread rows were only written for participant chat lines, never for
+    # system messages, so those are what the counter tracks.
+    op.execute("""
+        UPDATE tickets SET message_count = (
+            SELECT count(*) FROM chat_messages m
+            WHERE m.ticket_id = tickets.id AND NOT coalesce(m.is_system, false)
+        )
+    """)
+    # Every participant has read everything except their remaining unread rows;
+    # their cursor sits on the last message before the first unread one.
+    op.execute("""
+        INSERT INTO ticket_read_cursors (user_id, ticket_id, last_read_message_id, read_count, updated_at)
+        SELECT p.user_id, p.ticket_id,
+               (SELECT max(m.id) FROM chat_messages m
+                WHERE m.ticket_id = p.ticket_id
+                  AND NOT EXISTS (SELECT 1 FROM unread_messages u
+                                  WHERE u.ticket_id = p.ticket_id AND u.user_id = p.user_id
+                                    AND u.message_id <= m.id)),
+               CASE WHEN t.message_count > p.unread THEN t.message_count - p.unread ELSE 0 END,
+               CURRENT_TIMESTAMP
+        FROM (
+            SELECT participants.ticket_id, participants.user_id,
+                   (SELECT count(*) FROM unread_messages u
+                    WHERE u.ticket_id = participants.ticket_id
+                      AND u.user_id = participants.user_id) AS unread
+            FROM (
+                SELECT id AS ticket_id, user_id FROM tickets
+                UNION
+                SELECT id AS ticket_id, assigned_to AS user_id FROM tickets WHERE assigned_to IS NOT NULL
+            ) participants
+        ) p
+        JOIN tickets t ON t.id = p.ticket_id
+    """)
+    op.drop_table('unread_messages')
+
+
+def downgrade():
+    op.create_table(
+        'unread_messages',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('ticket_id', sa.Integer(), sa.ForeignKey('tickets.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('message_id', sa.Integer(), sa.ForeignKey('chat_messages.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.execute("""
+        INSERT INTO unread_messages (ticket_id, user_id, message_id, created_at)
+        SELECT c.ticket_id, c.user_id, m.id, m.timestamp
+        FROM ticket_read_cursors c
+        JOIN chat_messages m ON m.ticket_id = c.ticket_id
+        WHERE m.id > coalesce(c.last_read_message_id, 0)
+          AND NOT coalesce(m.is_system, false)
+          AND (m.sender_id IS NULL OR m.sender_id <> c.user_id)
+    """)
+    op.drop_table('ticket_read_cursors')
+    op.drop_column('tickets', 'message_count')
@@ -0,0 +1,24 @@
+"""member skills for category routing
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('skills', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    op.drop_column('users', 'skills')
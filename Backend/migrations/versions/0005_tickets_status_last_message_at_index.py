@@ -0,0 +1,24 @@
+"""(status, last_message_at) index for the inactivity sweeper
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tickets_status_last_message_at', 'tickets', ['status', 'last_message_at'])
+
+
+def downgrade():
+    op.drop_index('ix_tickets_status_last_message_at', table_name='tickets')
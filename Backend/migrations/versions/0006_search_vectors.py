@@ -0,0 +1,42 @@
+"""tsvector columns and GIN indexes for /api/search (Postgres only)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Other databases search with the LIKE fallback in app.py
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "ALTER TABLE tickets ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(subject, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"
+    )
+    op.execute("CREATE INDEX ix_tickets_search_vector ON tickets USING GIN (search_vector)")
+    op.execute(
+        "ALTER TABLE chat_messages ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "to_tsvector('english', message)) STORED"
+    )
+    op.execute("CREATE INDEX ix_chat_messages_search_vector ON chat_messages USING GIN (search_vector)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_chat_messages_search_vector', table_name='chat_messages')
+    op.drop_column('chat_messages', 'search_vector')
+    op.drop_index('ix_tickets_search_vector', table_name='tickets')
+    op.drop_column('tickets', 'search_vector')
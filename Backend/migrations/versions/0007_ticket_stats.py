@@ -0,0 +1,51 @@
+"""dashboard aggregates: ticket_stats, ticket_duration_buckets, accepted_at/closed_at
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tickets', sa.Column('accepted_at', sa.DateTime(), nullable=True))
+    op.add_column('tickets', sa.Column('closed_at', sa.DateTime(), nullable=True))
+    op.create_table(
+        'ticket_stats',
+        sa.Column('status', sa.String(length=20), primary_key=True),
+        sa.Column('priority', sa.String(length=20), primary_key=True),
+        sa.Column('category', sa.String(length=50), primary_key=True),
+        sa.Column('assigned_to', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'ticket_duration_buckets',
+        sa.Column('metric', sa.String(length=20), primary_key=True),
+        sa.Column('le', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+    )
+
+    # Counts can be rebuilt from the tickets table; accept and close times
+    # were never recorded, so the duration histograms start empty.
+    op.execute("""
+        INSERT INTO ticket_stats (status, priority, category, assigned_to, count)
+        SELECT status, priority, category, coalesce(assigned_to, 0), count(*)
+        FROM tickets
+        GROUP BY status, priority, category, coalesce(assigned_to, 0)
+    """)
+
+
+def downgrade():
+    op.drop_table('ticket_duration_buckets')
+    op.drop_table('ticket_stats')
+    op.drop_column('tickets', 'closed_at')
+    op.drop_column('tickets', 'accepted_at')
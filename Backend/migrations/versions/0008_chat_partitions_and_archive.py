@@ -0,0 +1,90 @@
+"""monthly range partitions for chat_messages (Postgres), chat_archives
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from datetime import datetime
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'id, ticket_id, sender_id, message, "timestamp", is_system'
+TRANSCRIPT_FIELDS = ('id', 'sender_id', 'message', 'timestamp', 'is_system')
+
+
+def _create_chat_messages(partitioned):
+    # Same columns as before; a partitioned table cannot have a primary key
+    # without the partition column, so it gets an index on id instead. The
+    # foreign keys are named, or Postgres would suffix them while the old
+    # table still holds the names.
+    op.execute(f"""
+        CREATE TABLE chat_messages (
+            id integer NOT NULL DEFAULT nextval('chat_messages_id_seq'){'' if partitioned else ' PRIMARY KEY'},
+            ticket_id integer NOT NULL CONSTRAINT chat_messages_ticket_id_fkey REFERENCES tickets (id),
+            sender_id integer CONSTRAINT chat_messages_sender_id_fkey REFERENCES users (id),
+            message text NOT NULL,
+            "timestamp" timestamp without time zone NOT NULL,
+            is_system boolean,
+            search_vector tsvector GENERATED ALWAYS AS (to_tsvector('english', message)) STORED
+        ){' PARTITION BY RANGE ("timestamp")' if partitioned else ''}
+    """)
+    if partitioned:
+        op.execute("CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT")
+
+
+def _swap_chat_messages(partitioned):
+    """Rebuild chat_messages as a partitioned or plain table, keeping its rows and id sequence."""
+    op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_old")
+    _create_chat_messages(partitioned)
+    # Every row lands in the default partition; `flask create-chat-partitions`
+    # then moves them into monthly ones, a month per transaction
+    op.execute(f"INSERT INTO chat_messages ({COLUMNS}) SELECT {COLUMNS} FROM chat_messages_old")
+    op.execute("DROP TABLE chat_messages_old")
+    op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY chat_messages.id")
+    if partitioned:
+        op.create_index('ix_chat_messages_id', 'chat_messages', ['id'])
+    op.create_index('ix_chat_messages_ticket_id_id', 'chat_messages', ['ticket_id', 'id'])
+    op.execute("CREATE INDEX ix_chat_messages_search_vector ON chat_messages USING GIN (search_vector)")
+
+
+def upgrade():
+    op.create_table(
+        'chat_archives',
+        sa.Column('ticket_id', sa.Integer(), sa.ForeignKey('tickets.id'), primary_key=True, autoincrement=False),
+        sa.Column('message_count', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.Column('transcript', sa.LargeBinary(), nullable=False),
+    )
+    if op.get_bind().dialect.name == 'postgresql':
+        _swap_chat_messages(partitioned=True)
+
+
+def downgrade():
+    # Put archived transcripts back before their table goes
+    bind = op.get_bind()
+    archives = sa.table('chat_archives', sa.column('ticket_id'), sa.column('transcript'))
+    messages = sa.table('chat_messages', sa.column('ticket_id'), *(sa.column(name) for name in TRANSCRIPT_FIELDS))
+    for ticket_id in bind.execute(sa.select(archives.c.ticket_id)).scalars().all():
+        transcript = bind.execute(sa.select(archives.c.transcript).where(archives.c.ticket_id == ticket_id)).scalar()
+        rows = []
+        for values in json.loads(zlib.decompress(transcript)):
+            row = dict(zip(TRANSCRIPT_FIELDS, values), ticket_id=ticket_id)
+            row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+            rows.append(row)
+        if rows:
+            bind.execute(messages.insert(), rows)
+    op.drop_table('chat_archives')
+    if bind.dialect.name == 'postgresql':
+        _swap_chat_messages(partitioned=False)
@@ -0,0 +1,72 @@
+"""per-ticket chat sequence: chat_messages.seq, tickets.chat_seq
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+TRANSCRIPT_FIELDS = ('id', 'sender_id', 'message', 'timestamp', 'is_system')
+
+
+def upgrade():
+    op.add_column('tickets', sa.Column('chat_seq', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('chat_messages', sa.Column('seq', sa.Integer(), nullable=True))
+
+    # Existing messages are numbered in id order; only new ones are numbered
+    # in commit order
+    op.execute("""
+        UPDATE chat_messages SET seq = numbered.seq
+        FROM (SELECT id, row_number() OVER (PARTITION BY ticket_id ORDER BY id) AS seq FROM chat_messages) AS numbered
+        WHERE chat_messages.id = numbered.id
+    """)
+    op.execute("""
+        UPDATE tickets SET chat_seq = coalesce((SELECT max(seq) FROM chat_messages WHERE ticket_id = tickets.id), 0)
+    """)
+
+    # Archived tickets are numbered across their transcript and any messages
+    # written since, and the transcripts gain a seq field
+    bind = op.get_bind()
+    archives = sa.table('chat_archives', sa.column('ticket_id'), sa.column('transcript'))
+    messages = sa.table('chat_messages', sa.column('id'), sa.column('ticket_id'), sa.column('seq'))
+    tickets = sa.table('tickets', sa.column('id'), sa.column('chat_seq'))
+    for ticket_id in bind.execute(sa.select(archives.c.ticket_id)).scalars().all():
+        transcript = bind.execute(sa.select(archives.c.transcript).where(archives.c.ticket_id == ticket_id)).scalar()
+        archived = json.loads(zlib.decompress(transcript))
+        live = bind.execute(sa.select(messages.c.id).where(messages.c.ticket_id == ticket_id)).scalars().all()
+        order = sorted([(values[0], values) for values in archived] + [(message_id, None) for message_id in live],
+                       key=lambda entry: entry[0])
+        for seq, (message_id, values) in enumerate(order, start=1):
+            if values is None:
+                bind.execute(messages.update().where(messages.c.id == message_id).values(seq=seq))
+            else:
+                values[len(TRANSCRIPT_FIELDS):] = [seq]
+        bind.execute(archives.update().where(archives.c.ticket_id == ticket_id).values(
+            transcript=zlib.compress(json.dumps(archived, separators=(',', ':')).encode())))
+        bind.execute(tickets.update().where(tickets.c.id == ticket_id).values(chat_seq=len(order)))
+
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.alter_column('seq', existing_type=sa.Integer(), nullable=False)
+    op.create_index('ix_chat_messages_ticket_id_seq', 'chat_messages', ['ticket_id', 'seq'])
+
+
+def downgrade():
+    # Archived transcripts keep their trailing seq field; earlier code reads
+    # only the fields it knows
+    op.drop_index('ix_chat_messages_ticket_id_seq', table_name='chat_messages')
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.drop_column('seq')
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_column('chat_seq')
@@ -0,0 +1,33 @@
+"""tickets.priority_rank and a (status, priority_rank, created_at, id) index for claim-next
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+# PRIORITY_ORDER as of this revision
+PRIORITY_RANK = "CASE priority WHEN 'High' THEN 0 WHEN 'Medium' THEN 1 WHEN 'Low' THEN 2 ELSE 3 END"
+
+
+def upgrade():
+    # Stored on Postgres, which fills it for existing rows as it adds it;
+    # virtual on SQLite, which cannot add a stored column
+    op.add_column('tickets', sa.Column('priority_rank', sa.SmallInteger(), sa.Computed(PRIORITY_RANK)))
+    op.create_index('ix_tickets_status_priority_rank_created_at_id', 'tickets',
+                    ['status', 'priority_rank', 'created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_tickets_status_priority_rank_created_at_id', table_name='tickets')
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_column('priority_rank')
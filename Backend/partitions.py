@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_y{month:%Y}m{month:%m}'
+
+
+def existing_partitions(conn, table):
+    return set(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass)"
+    ), {'table': table}).scalars())
+
+
+def ensure_month_partitions(engine, table, column, columns, until):
+    """Create the missing monthly partitions of ``table`` up to the month of ``until``.
+
+    ``table`` is range-partitioned on ``column`` with a ``<table>_default``
+    partition catching anything outside the monthly ones. Months start at
+    the oldest row in the default partition, or the current month of
+    ``until`` when it is empty, so the first run after partitioning an
+    existing table splits its history month by month.
+
+    A month whose rows are sitting in the default partition cannot simply
+    be created over them: its rows (``columns``, leaving out generated
+    ones) are moved into a new table first, which is then attached. Each
+    month is its own transaction. Returns the partitions created.
+    """
+    default = f'{table}_default'
+    with engine.connect() as conn:
+        existing = existing_partitions(conn, table)
+        oldest = conn.execute(text(f'SELECT min("{column}") FROM {default}')).scalar()
+    month = month_start(min(oldest, until) if oldest else until)
+    last = month_start(until)
+    cols = ', '.join(f'"{name}"' for name in columns)
+    created = []
+    while month <= last:
+        name = partition_name(table, month)
+        if name not in existing:
+            lo, hi = month, add_months(month, 1)
+            bounds = f"FROM ('{lo:%Y-%m-%d}') TO ('{hi:%Y-%m-%d}')"
+            in_range = f'"{column}" >= :lo AND "{column}" < :hi'
+            with engine.begin() as conn:
+                stranded = conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"),
+                                        {'lo': lo, 'hi': hi}).scalar()
+                if not stranded:
+                    conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+                else:
+                    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED)"))
+                    conn.execute(text(
+                        f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING {cols}) "
+                        f"INSERT INTO {name} ({cols}) SELECT {cols} FROM moved"
+                    ), {'lo': lo, 'hi': hi})
+                    # Indexes and foreign keys are added from the parent's
+                    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
@@ -0,0 +1,40 @@
+from eventlet import tpool
+from eventlet.semaphore import Semaphore
+from werkzeug.security import generate_password_hash, check_password_hash
+
+HASH_METHOD = 'pbkdf2:sha256'
+
+
+class HashingBusy(Exception):
+    """Every hashing slot stayed taken for longer than the queue timeout."""
+
+
+class PasswordHasher:
+    """Run pbkdf2 hashing on eventlet's native thread pool.
+
+    pbkdf2 is deliberately CPU-heavy; run inline it blocks the eventlet hub
+    and with it every socket and request on the process. Here it runs in
+    native threads (hashlib releases the GIL while it works), at most
+    ``concurrency`` at a time. A caller that cannot get a slot within
+    ``queue_timeout`` seconds gets HashingBusy, which the routes turn into
+    a 429, so a login storm queues only briefly and then sheds load.
+    """
+
+    def __init__(self, concurrency=4, queue_timeout=0.5):
+        self.concurrency = concurrency
+        self.queue_timeout = queue_timeout
+        self._slots = Semaphore(concurrency)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashingBusy()
+        try:
+            return tpool.execute(func, *args)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, HASH_METHOD)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
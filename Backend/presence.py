@@ -0,0 +1,232 @@
+import logging
+import time
+
+import eventlet
+
+logger = logging.getLogger(__name__)
+
+STATES = ('online', 'away', 'offline')
+
+
+class _User:
+    __slots__ = ('sids', 'state', 'last_active', 'last_seen')
+
+    def __init__(self):
+        self.sids = set()
+        self.state = 'offline'
+        self.last_active = 0.0
+        self.last_seen = None
+
+
+class Presence:
+    """Who is online or away, and who is typing in each ticket room, on this worker.
+
+    Connect, disconnect, join and leave come from the socket handlers; the
+    client may also declare itself away, and a user with no socket activity
+    for ``away_after`` seconds becomes away on its own. ``typing`` marks are
+    refreshed by the client while the user types and lapse after
+    ``typing_ttl`` seconds, so repeated keystrokes cost a dict update each
+    and no frame.
+
+    Nothing is broadcast as it happens. Changes mark the rooms they concern
+    and a green thread calls ``flush`` every ``interval`` seconds, which
+    sends at most one 'presence' frame per marked room with the latest
+    state of the users that changed and the room's current typists. A user
+    who flaps and ends where the room last saw them produces no frame.
+    """
+
+    def __init__(self, emit, interval=1.0, typing_ttl=6.0, away_after=300.0):
+        self.emit = emit
+        self.interval = interval
+        self.typing_ttl = typing_ttl
+        self.away_after = away_after
+        self.changes = 0
+        self.frames = 0
+        self._users = {}
+        self._sockets = {}      # sid -> (user_id, ticket rooms it joined)
+        self._rooms = {}        # room -> {user_id: sockets of theirs in it}
+        self._typing = {}       # room -> {user_id: expiry}
+        self._pending = {}      # room -> user_ids whose state changed
+        self._sent = {}         # room -> {user_id: state the room last heard}
+        self._typing_dirty = set()
+        self._worker = None
+
+    def _user(self, user_id):
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = _User()
+        return user
+
+    def _rooms_of(self, user_id):
+        rooms = set()
+        for sid in self._users[user_id].sids:
+            rooms.update(self._sockets[sid][1])
+        return rooms
+
+    def _set_state(self, user_id, state):
+        user = self._users[user_id]
+        if user.state == state:
+            return
+        user.state = state
+        if state == 'offline':
+            user.last_seen = time.time()
+        self.changes += 1
+        for room in self._rooms_of(user_id):
+            self._mark(room, user_id)
+
+    def _wake(self):
+        if self._worker is None:
+            self._worker = eventlet.spawn(self._run)
+
+    def connect(self, sid, user_id):
+        user_id = str(user_id)
+        user = self._user(user_id)
+        user.sids.add(sid)
+        user.last_active = time.monotonic()
+        self._sockets[sid] = (user_id, set())
+        self._set_state(user_id, 'online')
+
+    def _mark(self, room, user_id):
+        self._pending.setdefault(room, set()).add(user_id)
+        self._wake()
+
+    def disconnect(self, sid):
+        entry = self._sockets.get(sid)
+        if entry is None:
+            return
+        user_id, rooms = entry
+        user = self._users[user_id]
+        if len(user.sids) == 1:
+            # Before leaving the rooms, so they hear about it
+            self._set_state(user_id, 'offline')
+        for room in list(rooms):
+            self.leave(sid, room)
+        user.sids.discard(sid)
+        del self._sockets[sid]
+
+    def join(self, sid, room):
+        entry = self._sockets.get(sid)
+        if entry is None or room in entry[1]:
+            return
+        user_id, rooms = entry
+        rooms.add(room)
+        members = self._rooms.setdefault(room, {})
+        members[user_id] = members.get(user_id, 0) + 1
+        self.touch(sid)
+        # Let the others in the room know who just arrived
+        self._mark(room, user_id)
+
+    def leave(self, sid, room):
+        entry = self._sockets.get(sid)
+        if entry is None or room not in entry[1]:
+            return
+        user_id, rooms = entry
+        rooms.discard(room)
+        members = self._rooms[room]
+        members[user_id] -= 1
+        if not members[user_id]:
+            del members[user_id]
+            self._sent.get(room, {}).pop(user_id, None)
+            self.typing(sid, room, False)
+            if not members:
+                del self._rooms[room]
+                self._sent.pop(room, None)
+
+    def touch(self, sid):
+        """Socket activity: keeps the user online, or brings them back from away."""
+        entry = self._sockets.get(sid)
+        if entry is None:
+            return
+        user = self._users[entry[0]]
+        user.last_active = time.monotonic()
+        if user.state == 'away':
+            self._set_state(entry[0], 'online')
+
+    def set_away(self, sid, away):
+        entry = self._sockets.get(sid)
+        if entry is None:
+            return
+        if not away:
+            self.touch(sid)
+        else:
+            self._set_state(entry[0], 'away')
+
+    def typing(self, sid, room, is_typing):
+        entry = self._sockets.get(sid)
+        if entry is None:
+            return
+        user_id = entry[0]
+        typists = self._typing.setdefault(room, {})
+        if is_typing:
+            if user_id not in typists:
+                self._typing_dirty.add(room)
+                self._wake()
+            typists[user_id] = time.monotonic() + self.typing_ttl
+        elif typists.pop(user_id, None) is not None:
+            self._typing_dirty.add(room)
+        if not typists:
+            del self._typing[room]
+
+    def state(self, user_id):
+        user = self._users.get(str(user_id))
+        if user is None:
+            return {'state': 'offline', 'last_seen': None}
+        return {'state': user.state, 'last_seen': user.last_seen}
+
+    def snapshot(self, room):
+        """The full 'presence' frame for a room, sent to a socket as it joins."""
+        return {
+            'ticket_id': room,
+            'users': {user_id: self._users[user_id].state for user_id in self._rooms.get(room, ())},
+            'typing': sorted(self._typing.get(room, ()))
+        }
+
+    def counts(self):
+        counts = dict.fromkeys(STATES, 0)
+        for user in self._users.values():
+            counts[user.state] += 1
+        return counts
+
+    def flush(self):
+        """Send one frame per room with pending changes; returns how many were sent."""
+        now = time.monotonic()
+        for room, typists in list(self._typing.items()):
+            expired = [user_id for user_id, expiry in typists.items() if expiry <= now]
+            for user_id in expired:
+                del typists[user_id]
+            if expired:
+                self._typing_dirty.add(room)
+                if not typists:
+                    del self._typing[room]
+        idle_since = now - self.away_after
+        for user_id, user in self._users.items():
+            if user.state == 'online' and user.last_active < idle_since:
+                self._set_state(user_id, 'away')
+
+        pending, self._pending = self._pending, {}
+        typing_dirty, self._typing_dirty = self._typing_dirty, set()
+        frames = 0
+        for room in set(pending) | typing_dirty:
+            sent = self._sent.setdefault(room, {}) if room in self._rooms else {}
+            users = {}
+            for user_id in pending.get(room, ()):
+                state = self._users[user_id].state
+                if sent.get(user_id) != state:
+                    users[user_id] = sent[user_id] = state
+            if not users and room not in typing_dirty:
+                continue
+            frame = {'ticket_id': room, 'users': users}
+            if room in typing_dirty:
+                frame['typing'] = sorted(self._typing.get(room, ()))
+            self.emit('presence', frame, room=room)
+            frames += 1
+        self.frames += frames
+        return frames
+
+    def _run(self):
+        while True:
+            eventlet.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Error flushing presence: %s", e)
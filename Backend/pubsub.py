@@ -0,0 +1,156 @@
+"""Cross-process Socket.IO client managers.
+
+Socket.IO emits made on one worker have to reach clients connected to the
+others. python-socketio does that through a ``PubSubManager``: every emit is
+published on a shared channel and each worker delivers it to its own sockets.
+Redis and AMQP are covered by the stock ``KombuManager``; the adapters here
+need nothing beyond what the app already runs on:
+
+* ``unix:///path``        - datagram sockets in a shared directory, for
+                            several workers on one host (and offline tests)
+* ``postgresql://...``    - LISTEN/NOTIFY on the application database
+
+Messages are JSON encoded, so nothing written to the channel is unpickled.
+"""
+import json
+import logging
+import os
+import select
+import socket
+import time
+from urllib.parse import urlparse
+
+import socketio
+
+logger = logging.getLogger(__name__)
+
+
+class UnixSocketManager(socketio.PubSubManager):
+    """Fan out emits to every worker on this host over Unix datagram sockets.
+
+    Each worker binds ``<directory>/<channel>/<host_id>.sock`` and publishing
+    sends the message to every socket in that directory, including its own.
+    Sockets left behind by dead workers are removed on the first failed send.
+    """
+    name = 'unix'
+    max_message_size = 200 * 1024
+    peer_refresh_interval = 1.0
+
+    def __init__(self, url='unix:///tmp/support-ticket-socketio', channel='socketio',
+                 write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.directory = os.path.join(urlparse(url).path or '/tmp/support-ticket-socketio', channel)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self.path = os.path.join(self.directory, f'{self.host_id}.sock')
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._peers = []
+        self._peers_checked = 0
+
+    def _peer_paths(self):
+        now = time.monotonic()
+        if now - self._peers_checked > self.peer_refresh_interval:
+            self._peers = [os.path.join(self.directory, name)
+                           for name in os.listdir(self.directory) if name.endswith('.sock')]
+            self._peers_checked = now
+        return self._peers
+
+    def _publish(self, data):
+        payload = json.dumps(data).encode()
+        if len(payload) > self.max_message_size:
+            logger.error("Dropping %d byte pub/sub message, limit is %d",
+                         len(payload), self.max_message_size)
+            return
+        for path in self._peer_paths():
+            try:
+                self._sender.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody is bound to it any more: a worker exited uncleanly
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                self._peers_checked = 0
+
+    def _listen(self):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        listener.bind(self.path)
+        self._peers_checked = 0
+        try:
+            while True:
+                yield listener.recv(self.max_message_size).decode()
+        finally:
+            listener.close()
+            os.unlink(self.path)
+
+
+class PostgresNotifyManager(socketio.PubSubManager):
+    """Fan out emits between workers with Postgres LISTEN/NOTIFY.
+
+    NOTIFY payloads are limited to 8000 bytes, which comfortably fits chat
+    events under the server's max_http_buffer_size.
+    """
+    name = 'postgres'
+    max_message_size = 7999
+
+    def __init__(self, url, channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        # SQLAlchemy URLs may name the driver, libpq does not understand that
+        self.dsn = url.replace('postgresql+psycopg2://', 'postgresql://', 1)
+        self._publisher = None
+
+    def _connect(self):
+        import psycopg2
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+
+    def _publish(self, data):
+        payload = json.dumps(data)
+        if len(payload.encode()) > self.max_message_size:
+            logger.error("Dropping %d byte pub/sub message, NOTIFY limit is %d",
+                         len(payload), self.max_message_size)
+            return
+        for attempt in (1, 2):
+            try:
+                if self._publisher is None or self._publisher.closed:
+                    self._publisher = self._connect()
+                with self._publisher.cursor() as cursor:
+                    cursor.execute('SELECT pg_notify(%s, %s)', (self.channel, payload))
+                return
+            except Exception:
+                self._publisher = None
+                if attempt == 2:
+                    raise
+
+    def _listen(self):
+        while True:
+            try:
+                conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                while True:
+                    select.select([conn], [], [])
+                    conn.poll()
+                    while conn.notifies:
+                        yield conn.notifies.pop(0).payload
+            except Exception as e:
+                logger.error("Pub/sub listener lost its connection: %s", e)
+                time.sleep(1)
+
+
+def message_queue_options(url):
+    """SocketIO keyword arguments for the message queue at ``url``.
+
+    ``unix://`` and ``postgres(ql)://`` use the adapters above; anything else
+    (``redis://``, ``amqp://``) is handed to Flask-SocketIO's own support.
+    """
+    if not url:
+        return {}
+    scheme = urlparse(url).scheme
+    if scheme == 'unix':
+        return {'client_manager': UnixSocketManager(url)}
+    if scheme.startswith('postgres'):
+        return {'client_manager': PostgresNotifyManager(url)}
+    return {'message_queue': url}
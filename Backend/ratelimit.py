@@ -0,0 +1,151 @@
+import time
+from collections import Counter
+from functools import wraps
+
+import eventlet
+
+
+class RateLimited(Exception):
+    def __init__(self, event, scope, retry_after):
+        super().__init__(f'{event} rate limited per {scope}')
+        self.event = event
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'stamp')
+
+    def __init__(self, tokens, stamp):
+        self.tokens = tokens
+        self.stamp = stamp
+
+
+def parse_limits(spec):
+    """``"message=5/10,join=5/20"`` -> ``{'message': (5.0, 10.0), 'join': (5.0, 20.0)}``
+
+    Each entry is tokens per second and burst size.
+    """
+    limits = {}
+    for part in (spec or '').split(','):
+        if '=' in part:
+            event, value = part.split('=', 1)
+            rate, _, burst = value.partition('/')
+            limits[event.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+class RateLimiter:
+    """Token buckets per socket and per user for inbound Socket.IO events.
+
+    ``sid_limits`` and ``user_limits`` map an event name to (rate, burst).
+    An event must fit both its socket's and its user's bucket. When a
+    bucket is empty the event is rejected, or with ``max_delay`` it may
+    reserve a future token and wait up to that long for it; the handler is
+    then simply run later, and events from one socket keep their order.
+
+    Buckets are two-slot objects in one dict per event, keyed by sid or
+    user id. Socket buckets go with ``forget(sid)`` on disconnect; user
+    buckets that have refilled are pruned every ``prune_interval`` seconds.
+    """
+
+    def __init__(self, sid_limits=None, user_limits=None, max_delay=0.0, prune_interval=60.0):
+        self.sid_limits = dict(sid_limits or {})
+        self.user_limits = dict(user_limits or {})
+        self.max_delay = max_delay
+        self.prune_interval = prune_interval
+        self.rejected = Counter()   # (event, scope) -> events rejected
+        self.delayed = Counter()    # event -> events made to wait
+        self._sid_buckets = {event: {} for event in self.sid_limits}
+        self._user_buckets = {event: {} for event in self.user_limits}
+        self._pruned = time.monotonic()
+
+    def _reserve(self, buckets, key, rate, burst, now):
+        """Take a token and return how long until it is actually available."""
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = _Bucket(burst - 1, now)
+            return 0.0
+        tokens = min(burst, bucket.tokens + (now - bucket.stamp) * rate) - 1
+        if tokens < 0 and -tokens / rate > self.max_delay:
+            return None
+        bucket.tokens = tokens
+        bucket.stamp = now
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def _release(self, buckets, key):
+        buckets[key].tokens += 1
+
+    def acquire(self, event, sid, user_id):
+        """Seconds to wait before handling ``event``; raises RateLimited instead of waiting too long."""
+        now = time.monotonic()
+        delay = 0.0
+        limit = self.sid_limits.get(event)
+        if limit is not None:
+            delay = self._reserve(self._sid_buckets[event], sid, limit[0], limit[1], now)
+            if delay is None:
+                self.rejected[event, 'sid'] += 1
+                raise RateLimited(event, 'sid', self._retry_after(self._sid_buckets[event][sid], limit))
+        limit = self.user_limits.get(event)
+        if limit is not None and user_id is not None:
+            user_delay = self._reserve(self._user_buckets[event], user_id, limit[0], limit[1], now)
+            if user_delay is None:
+                if event in self.sid_limits:
+                    self._release(self._sid_buckets[event], sid)
+                self.rejected[event, 'user'] += 1
+                raise RateLimited(event, 'user', self._retry_after(self._user_buckets[event][user_id], limit))
+            delay = max(delay, user_delay)
+        if now - self._pruned > self.prune_interval:
+            self.prune(now)
+        if delay:
+            self.delayed[event] += 1
+        return delay
+
+    @staticmethod
+    def _retry_after(bucket, limit):
+        # Time until one whole token has accrued again
+        rate = limit[0]
+        tokens = bucket.tokens + (time.monotonic() - bucket.stamp) * rate
+        return max(0.0, (1 - tokens) / rate)
+
+    def forget(self, sid):
+        for buckets in self._sid_buckets.values():
+            buckets.pop(sid, None)
+
+    def prune(self, now=None):
+        """Drop user buckets that have refilled; a fresh bucket behaves the same."""
+        now = time.monotonic() if now is None else now
+        for event, buckets in self._user_buckets.items():
+            rate, burst = self.user_limits[event]
+            full = [key for key, bucket in buckets.items() if bucket.tokens + (now - bucket.stamp) * rate >= burst]
+            for key in full:
+                del buckets[key]
+        self._pruned = now
+
+    def bucket_count(self):
+        return (sum(len(b) for b in self._sid_buckets.values()),
+                sum(len(b) for b in self._user_buckets.values()))
+
+    def limit(self, event, identify, on_limited):
+        """Decorator applying the limits for ``event`` to a Socket.IO handler.
+
+        ``identify()`` returns the current (sid, user_id); ``on_limited(exc,
+        *args)`` is called instead of the handler when the event is rejected.
+        Events without a configured limit get the handler back unchanged.
+        """
+        def decorator(handler):
+            if event not in self.sid_limits and event not in self.user_limits:
+                return handler
+
+            @wraps(handler)
+            def wrapper(*args, **kwargs):
+                sid, user_id = identify()
+                try:
+                    delay = self.acquire(event, sid, user_id)
+                except RateLimited as e:
+                    return on_limited(e, *args)
+                if delay:
+                    eventlet.sleep(delay)
+                return handler(*args, **kwargs)
+            return wrapper
+        return decorator
@@ -0,0 +1,97 @@
+import bisect
+
+import socketio
+
+from cache import LRUCache
+
+
+def _after(events, seq):
+    """Index just past the events with ``seq`` in a list sorted by seq."""
+    # (seq + 1,) sorts before every (seq + 1, event, data) without comparing data
+    return bisect.bisect_left(events, (seq + 1,))
+
+
+class ReplayBuffer:
+    """Recent events per ticket room, replayed to sockets that rejoin.
+
+    Room emits whose payload carries a ``seq`` are recorded. The seq is the
+    position of the chat message behind the event in its ticket's chat,
+    1, 2, 3... with no gaps, so a missing seq means a missing event. Emits
+    can arrive out of seq order, as when two messages commit close together
+    and their senders emit in the opposite order, so events are kept sorted
+    by seq rather than by arrival. Events are recorded as this worker's
+    client manager delivers them rather than where they are emitted, so with
+    a message queue every worker buffers every ticket's events, whichever
+    worker sent them.
+
+    Each ticket keeps its last ``size`` events. A ticket with no event for
+    ``ttl`` seconds, or outside the ``max_tickets`` most recently active, is
+    dropped.
+    """
+
+    def __init__(self, size=200, max_tickets=10000, ttl=3600):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._rooms = LRUCache(max_tickets, ttl=ttl)
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def record(self, room, event, data):
+        seq = data.get('seq') if isinstance(data, dict) else None
+        if seq is None or room is None:
+            return
+        events = self._rooms.get(room)
+        if events is None:
+            events = []
+        # Usually an append; events with the same seq stay in arrival order
+        events.insert(_after(events, seq), (seq, event, data))
+        if len(events) > self.size:
+            # All of the oldest seq's events go together, so a seq is either whole or gone
+            del events[:_after(events, events[0][0])]
+        # Re-set on every event so the TTL counts from the ticket's last activity
+        self._rooms.set(room, events)
+
+    def since(self, room, last_seq):
+        """Events in ``room`` after ``last_seq``, oldest first.
+
+        Returns None when the buffer cannot vouch for the whole gap: a seq
+        after ``last_seq`` was evicted or has not reached this worker yet.
+        The caller then has to read the gap from the database.
+        """
+        events = self._rooms.get(room)
+        missed = events[_after(events, last_seq):] if events else []
+        expected = last_seq + 1
+        for seq, _, _ in missed:
+            if seq > expected:
+                break
+            expected = seq + 1
+        else:
+            # The buffer is only sure nothing is missing when it holds last_seq
+            # itself or the seq after it
+            if events and events[0][0] <= last_seq + 1:
+                self.hits += 1
+                return missed
+        self.misses += 1
+        return None
+
+    def watch(self, manager):
+        """Record sequenced emits as a python-socketio client manager delivers them."""
+        if isinstance(manager, socketio.PubSubManager):
+            # Every worker, the sender included, delivers through _handle_emit
+            handle_emit = manager._handle_emit
+
+            def recording_handle_emit(message):
+                self.record(message.get('room'), message.get('event'), message.get('data'))
+                return handle_emit(message)
+
+            manager._handle_emit = recording_handle_emit
+        else:
+            emit = manager.emit
+
+            def recording_emit(event, data, namespace, room=None, **kwargs):
+                self.record(room, event, data)
+                return emit(event, data, namespace, room=room, **kwargs)
+
+            manager.emit = recording_emit
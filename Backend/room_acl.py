@@ -0,0 +1,81 @@
+from cache import LRUCache
+
+
+def _peer(user_id, row):
+    # The other party on a ticket: the assignee for its owner, the owner for its assignee
+    _, owner, assignee = row
+    return (int(assignee) if assignee else None) if int(owner) == user_id else int(owner)
+
+
+class RoomACL:
+    """Decide which ticket rooms a user's sockets may join.
+
+    Each user's tickets (ones they own or are assigned to) are loaded with
+    ``load(user_id)`` as (ticket id, owner, assignee) rows and cached for
+    ``ttl`` seconds, so joins and reconnect storms cost at most one query
+    per user per ``ttl``. Routes that hand a ticket to someone call
+    ``grant``/``revoke``, which patch the cached entries in place. A join
+    for a ticket missing from the cache is re-checked once with
+    ``verify(user_id, ticket_id)``, which returns the ticket's row or None,
+    before it is refused; that picks up assignments made on other workers.
+    Admins may join any room. ``allows`` is the same check without the
+    join counters, for events in a room the socket has already joined.
+
+    The cache also remembers the other party on each ticket, so ``peers``
+    tells who a user deals with (a member's customers, a customer's
+    members) from the same entries.
+    """
+
+    def __init__(self, load, verify, maxsize=10000, ttl=300):
+        self.load = load
+        self.verify = verify
+        self.allowed_joins = 0
+        self.denied_joins = 0
+        self._sets = LRUCache(maxsize, ttl=ttl)
+
+    def _tickets(self, user_id):
+        """{ticket id: other party or None} for one user."""
+        tickets = self._sets.get(user_id)
+        if tickets is None:
+            tickets = {row[0]: _peer(user_id, row) for row in self.load(user_id)}
+            self._sets.set(user_id, tickets)
+        return tickets
+
+    def allows(self, user_id, role, ticket_id):
+        if role == 'admin':
+            return True
+        user_id, ticket_id = int(user_id), int(ticket_id)
+        tickets = self._tickets(user_id)
+        if ticket_id in tickets:
+            return True
+        row = self.verify(user_id, ticket_id)
+        if row is None:
+            return False
+        tickets[ticket_id] = _peer(user_id, row)
+        return True
+
+    def can_join(self, user_id, role, ticket_id):
+        allowed = self.allows(user_id, role, ticket_id)
+        if allowed:
+            self.allowed_joins += 1
+        else:
+            self.denied_joins += 1
+        return allowed
+
+    def peers(self, user_id):
+        """Ids of the users on the other side of a user's tickets."""
+        return {peer for peer in self._tickets(int(user_id)).values() if peer}
+
+    def grant(self, user_id, ticket_id, peer_id=None):
+        # Only patch entries already loaded; others load fresh when needed
+        tickets = self._sets.get(int(user_id))
+        if tickets is not None:
+            tickets[int(ticket_id)] = int(peer_id) if peer_id else None
+
+    def revoke(self, user_id, ticket_id):
+        tickets = self._sets.get(int(user_id))
+        if tickets is not None:
+            tickets.pop(int(ticket_id), None)
+
+    def stats(self):
+        return dict(self._sets.stats(), allowed_joins=self.allowed_joins, denied_joins=self.denied_joins)
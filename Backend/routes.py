@@ -1,11 +1,12 @@
 from flask import Blueprint
 from flask_restx import Api, Resource, fields, Namespace
-from werkzeug.security import generate_password_hash, check_password_hash
 from models import User, db
+from passwords import PasswordHasher, HashingBusy
 from datetime import datetime
 from http import HTTPStatus
 
 auth_bp = Blueprint('auth', __name__)
+password_hasher = PasswordHasher()
 api = Namespace('auth', description='Authentication operations')
 
 # Define Swagger models
@@ -33,6 +34,7 @@ class Signup(Resource):
     @api.response(201, "User successfully registered.")
     @api.response(400, "Bad request.")
     @api.response(409, "User already exists.")
+    @api.response(429, "Too many sign-ups in progress.")
     def post(self):
         """Register a new user"""
         data = api.payload
@@ -44,7 +46,10 @@ class Signup(Resource):
             return {"error": "Phone number already exists"}, HTTPStatus.CONFLICT
 
         # Hash password
-        hashed_password = generate_password_hash(data["password"], method="pbkdf2:sha256")
+        try:
+            hashed_password = password_hasher.hash(data["password"])
+        except HashingBusy:
+            return {"error": "Too many sign-ups in progress, please retry"}, HTTPStatus.TOO_MANY_REQUESTS
 
         # Parse DOB
         try:
@@ -76,13 +81,17 @@ class Login(Resource):
     @api.expect(login_model)
     @api.response(200, "Login successful.")
     @api.response(401, "Invalid credentials.")
+    @api.response(429, "Too many logins in progress.")
     def post(self):
         """Login a user"""
         data = api.payload
         user = User.query.filter_by(email=data["email"]).first()
 
-        if not user or not check_password_hash(user.password, data["password"]):
-            return {"error": "Invalid email or password"}, HTTPStatus.UNAUTHORIZED
+        try:
+            if not user or not password_hasher.verify(user.password, data["password"]):
+                return {"error": "Invalid email or password"}, HTTPStatus.UNAUTHORIZED
+        except HashingBusy:
+            return {"error": "Too many logins in progress, please retry"}, HTTPStatus.TOO_MANY_REQUESTS
 
         return {
             "message": "Login successful",
@@ -0,0 +1,72 @@
+import logging
+import time
+
+import eventlet
+from eventlet.queue import LightQueue, Empty
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Queue items in-process and hand them to ``flush`` in group-commit batches.
+
+    A batch is flushed as soon as it holds ``max_batch`` items or ``max_delay``
+    seconds after its first item arrived, whichever comes first. ``flush`` runs
+    on a single background green thread, so batches are written in order.
+    """
+
+    def __init__(self, flush, max_batch=100, max_delay=0.05):
+        self.flush = flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = LightQueue()
+        self._in_flight = 0   # Taken off the queue, not flushed yet
+        self._worker = None
+
+    def submit(self, item):
+        if self._worker is None:
+            self._worker = eventlet.spawn(self._run)
+        self._queue.put(item)
+
+    def pending(self):
+        """Items submitted and not yet flushed, including a batch being written."""
+        return self._queue.qsize() + self._in_flight
+
+    def drain(self):
+        """Flush everything queued so far on the calling green thread."""
+        while True:
+            batch = self._collect(block=False)
+            if not batch:
+                return
+            self._flush(batch)
+
+    def _collect(self, block=True):
+        try:
+            first = self._queue.get(block=block)
+        except Empty:
+            return []
+        batch = [first]
+        self._in_flight += 1
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+                self._in_flight += 1
+            except Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        try:
+            self.flush(batch)
+        except Exception:
+            logger.exception("Write-behind flush of %d items failed", len(batch))
+        finally:
+            self._in_flight -= len(batch)
+
+    def _run(self):
+        while True:
+            self._flush(self._collect())
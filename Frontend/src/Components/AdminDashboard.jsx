@@ -85,10 +85,11 @@ function AdminDashboard() {
           )
         );
       });
-      socket.on('chat_inactive', ({ ticket_id, reason }) => {
+      socket.on('chat_inactive', ({ tickets, reason }) => {
+        const closedIds = new Set(tickets.map(({ ticket_id }) => ticket_id));
         setTickets((prev) =>
           prev.map((ticket) =>
-            ticket.id === ticket_id
+            closedIds.has(ticket.id)
               ? { ...ticket, status: 'closed', closure_reason: reason }
               : ticket
           )
@@ -215,13 +215,14 @@ function MemberDashboard() {
       });
       socket.on('ticket_reopened', fetchTickets);
       socket.on('ticket_closed', fetchTickets);
-      socket.on('chat_inactive', ({ ticket_id, reason, reassigned_to }) => {
+      socket.on('chat_inactive', ({ tickets, reason }) => {
+        const closedIds = new Set(tickets.map(({ ticket_id }) => ticket_id));
         setTickets(prev =>
           prev.map(t =>
-            t.id === ticket_id ? { ...t, status: 'closed', closure_reason: reason, reassigned_to } : t
+            closedIds.has(t.id) ? { ...t, status: 'closed', closure_reason: reason } : t
           )
         );
-        if (selectedTicket?.id === ticket_id) {
+        if (closedIds.has(selectedTicket?.id)) {
           setSelectedTicket(null);
           navigate('/member/tickets');
         }
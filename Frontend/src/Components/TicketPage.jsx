@@ -294,7 +294,7 @@ function TicketPage() {
       setLoading(true);
       setError(null);
       const token = localStorage.getItem('token');
-      const ticketsRes = await fetch(`${API_URL}/api/tickets`, {
+      const ticketsRes = await fetch(`${API_URL}/api/tickets?include=unread,last_message`, {
         headers: { 'Authorization': `Bearer ${token}`, 'Content-Type': 'application/json' }
       });
 
@@ -307,12 +307,6 @@ function TicketPage() {
 
       const ticketsWithDetails = await Promise.all(ticketsData.map(async ticket => {
         try {
-          const unreadRes = fetch(`${API_URL}/api/tickets/${ticket.id}/unread`, {
-            headers: { 'Authorization': `Bearer ${token}` }
-          });
-          const [unreadResponse] = await Promise.all([unreadRes]);
-
-          const unreadCount = unreadResponse.ok ? await unreadResponse.json() : 0;
           const userData = await fetchUser(ticket.user_id, token);
 
           return {
@@ -321,7 +315,7 @@ function TicketPage() {
             userEmail: userData.email || '',
             lastMessage: ticket.last_message || 'No messages yet',
             lastMessageTime: ticket.last_message_time || ticket.created_at,
-            unreadCount: unreadCount || 0
+            unreadCount: ticket.unread_count || 0
           };
         } catch (err) {
           console.error(`Error fetching details for ticket ${ticket.id}:`, err);
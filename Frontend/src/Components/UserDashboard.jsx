@@ -131,17 +131,18 @@ function UserDashboard() {
           }
         });
 
-        socket.on('chat_inactive', ({ ticket_id, reason }) => {
+        socket.on('chat_inactive', ({ tickets, reason }) => {
+          const closedIds = new Set(tickets.map(({ ticket_id }) => ticket_id));
           setTickets((prev) =>
             prev
               .map((ticket) =>
-                ticket.id === ticket_id
+                closedIds.has(ticket.id)
                   ? { ...ticket, status: 'closed', closure_reason: reason }
                   : ticket
               )
               .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
           );
-          if (selectedTicket?.id === ticket_id) {
+          if (closedIds.has(selectedTicket?.id)) {
             setSelectedTicket((prev) => ({ ...prev, status: 'closed', closure_reason: reason }));
           }
         });